@@ -851,6 +851,10 @@ impl Actions {
 
         // Ensure any remaining pane processes are terminated before removing the worktree.
         for pid in pane_pids {
+            #[cfg(target_os = "linux")]
+            let _ = crate::mux::signal_pid(pid, crate::mux::Signal::Term);
+
+            #[cfg(not(target_os = "linux"))]
             let _ = std::process::Command::new("kill")
                 .arg("-TERM")
                 .arg(pid.to_string())
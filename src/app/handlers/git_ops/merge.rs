@@ -128,31 +128,49 @@ impl Actions {
     }
 
     /// Find the worktree path for a branch, if one exists
+    ///
+    /// The porcelain listing is parsed as it streams in, so the search stops at the matching
+    /// worktree instead of buffering the full output of repositories with many worktrees.
     fn find_worktree_for_branch(
         repo_path: &std::path::Path,
         branch: &str,
     ) -> Result<Option<std::path::PathBuf>> {
-        let output = crate::git::git_command()
+        use std::io::{BufRead as _, BufReader};
+
+        let mut child = crate::git::git_command()
             .args(["worktree", "list", "--porcelain"])
             .current_dir(repo_path)
-            .output()
+            .stdin(std::process::Stdio::null())
+            .stdout(std::process::Stdio::piped())
+            .stderr(std::process::Stdio::null())
+            .spawn()
             .context("Failed to list worktrees")?;
 
-        let stdout = String::from_utf8_lossy(&output.stdout);
-
         let mut current_worktree: Option<std::path::PathBuf> = None;
-
-        for line in stdout.lines() {
-            if let Some(path) = line.strip_prefix("worktree ") {
-                current_worktree = Some(std::path::PathBuf::from(path));
-            } else if let Some(worktree_branch) = line.strip_prefix("branch refs/heads/")
-                && worktree_branch == branch
-            {
-                return Ok(current_worktree);
+        let mut found = None;
+
+        if let Some(stdout) = child.stdout.take() {
+            for line in BufReader::new(stdout).split(b'\n') {
+                let Ok(line) = line else {
+                    break;
+                };
+                let line = String::from_utf8_lossy(&line);
+
+                if let Some(path) = line.strip_prefix("worktree ") {
+                    current_worktree = Some(std::path::PathBuf::from(path));
+                } else if let Some(worktree_branch) = line.strip_prefix("branch refs/heads/")
+                    && worktree_branch == branch
+                {
+                    found = current_worktree;
+                    break;
+                }
             }
         }
 
-        Ok(None)
+        // Stdout is closed by now, so git exits promptly even if we stopped reading early.
+        let _ = child.wait();
+
+        Ok(found)
     }
 
     /// Execute merge directly in a worktree (when target branch is checked out there)
@@ -400,7 +418,22 @@ impl Actions {
     }
 
     /// Get current branch name
+    ///
+    /// Reads `HEAD` in-process and only falls back to `git rev-parse` when libgit2 cannot
+    /// resolve it (for example an unborn branch). A detached `HEAD` is reported as `HEAD`,
+    /// matching `git rev-parse --abbrev-ref HEAD`.
     fn git_get_current_branch(repo_path: &std::path::Path) -> Result<String> {
+        if let Ok(repo) = git::open_repository(repo_path)
+            && let Ok(head) = repo.head()
+        {
+            if !head.is_branch() {
+                return Ok("HEAD".to_string());
+            }
+            if let Some(name) = head.shorthand() {
+                return Ok(name.to_string());
+            }
+        }
+
         let output = crate::git::git_command()
             .args(["rev-parse", "--abbrev-ref", "HEAD"])
             .current_dir(repo_path)
@@ -295,18 +295,21 @@ fn run_interactive(
 ) -> Result<()> {
     let cwd = std::env::current_dir().ok();
 
-    let cwd_project_root = cwd
-        .as_ref()
-        .map(|cwd| crate::git::repository_workspace_root(cwd).unwrap_or_else(|_| cwd.clone()));
+    // Discover the repository once: a workspace root also tells us that `cwd` is inside git.
+    let cwd_workspace_root = cwd
+        .as_deref()
+        .and_then(|cwd| crate::git::repository_workspace_root(cwd).ok());
 
     // Ensure .tenex/ is excluded from git tracking
     if let Some(cwd) = cwd.as_ref()
-        && crate::git::is_git_repository(cwd)
+        && cwd_workspace_root.is_some()
         && let Err(e) = crate::git::ensure_tenex_excluded(cwd)
     {
         eprintln!("Warning: Failed to exclude .tenex from git: {e}");
     }
 
+    let cwd_project_root = cwd_workspace_root.or(cwd);
+
     // keyboard_enhancement_supported will be set in tui::run after terminal setup
     let mut app = App::new(config, storage, settings, false);
     if let Some(message) = storage_load_error {
@@ -29,6 +29,10 @@ pub use git2::Repository;
 /// Git hooks can set variables like `GIT_DIR` which override repository discovery and ignore
 /// `current_dir`. Clearing these for child processes ensures Tenex operates on the intended
 /// worktree repositories.
+///
+/// Only variables that are actually set are removed: any environment edit makes `Command` copy
+/// the whole parent environment for the child, which is wasted work in the common case where
+/// none of them are present.
 #[must_use]
 pub(crate) fn git_command() -> Command {
     let program = "git";
@@ -44,7 +48,9 @@ pub(crate) fn git_command() -> Command {
         "GIT_NAMESPACE",
         "GIT_PREFIX",
     ] {
-        cmd.env_remove(var);
+        if std::env::var_os(var).is_some() {
+            cmd.env_remove(var);
+        }
     }
     cmd
 }
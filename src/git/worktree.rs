@@ -2,9 +2,12 @@
 
 use anyhow::{Context, Result, bail};
 use git2::Repository;
+use parking_lot::Mutex;
+use std::collections::HashSet;
 use std::fs;
 use std::path::{Path, PathBuf};
 use std::process::Stdio;
+use std::sync::OnceLock;
 use tracing::{debug, info, warn};
 
 const LOCAL_INSTRUCTION_FILE_NAMES: &[&str] = &["AGENTS.md", "CLAUDE.md"];
@@ -39,6 +42,114 @@ fn remove_dir_all_with_retries(path: &Path) -> Result<()> {
     Ok(())
 }
 
+/// Marker embedded in the name of worktree directories that are being deleted in the background.
+const TRASH_MARKER: &str = ".tenex-delete-";
+
+/// Move a directory to a hidden sibling so it can be deleted without blocking the caller.
+///
+/// Renaming frees the original path immediately. Returns the new location, or `None` when the
+/// directory does not exist or cannot be moved (for example because files are still locked on
+/// Windows), in which case the caller should delete it in place.
+///
+/// The first call for each parent directory in a process also schedules the deletion of any
+/// trash left there by an earlier run whose background delete failed or was interrupted.
+fn move_dir_aside(path: &Path) -> Option<PathBuf> {
+    static SWEPT_PARENTS: OnceLock<Mutex<HashSet<PathBuf>>> = OnceLock::new();
+
+    if !path.exists() {
+        return None;
+    }
+    let name = path.file_name()?;
+
+    if let Some(parent) = path.parent() {
+        let first_visit = SWEPT_PARENTS
+            .get_or_init(|| Mutex::new(HashSet::new()))
+            .lock()
+            .insert(parent.to_path_buf());
+        if first_visit {
+            remove_stale_trash_dirs(parent);
+        }
+    }
+
+    let mut trash_name = std::ffi::OsString::from(".");
+    trash_name.push(name);
+    trash_name.push(TRASH_MARKER);
+    trash_name.push(uuid::Uuid::new_v4().simple().to_string());
+    let trash = path.with_file_name(trash_name);
+
+    match fs::rename(path, &trash) {
+        Ok(()) => Some(trash),
+        Err(e) => {
+            debug!(path = ?path, error = %e, "Failed to move directory aside; deleting in place");
+            None
+        }
+    }
+}
+
+/// Delete directories in `parent` that [`move_dir_aside`] moved there but never finished deleting.
+fn remove_stale_trash_dirs(parent: &Path) {
+    let Ok(entries) = fs::read_dir(parent) else {
+        return;
+    };
+
+    for entry in entries.flatten() {
+        let file_name = entry.file_name();
+        let is_trash = file_name
+            .to_str()
+            .is_some_and(|name| name.starts_with('.') && name.contains(TRASH_MARKER));
+        if is_trash && entry.file_type().is_ok_and(|file_type| file_type.is_dir()) {
+            debug!(path = ?entry.path(), "Removing stale worktree trash");
+            spawn_remove_dir_all(entry.path());
+        }
+    }
+}
+
+/// Delete `path` off the calling thread.
+///
+/// On Unix this runs a detached `rm -rf`, which unlinks natively and keeps going if Tenex exits
+/// before the delete finishes. Elsewhere (or if `rm` cannot be spawned) a thread does the work.
+/// Anything left behind is picked up by [`remove_stale_trash_dirs`] on a later run.
+fn spawn_remove_dir_all(path: PathBuf) {
+    #[cfg(unix)]
+    {
+        use std::os::unix::process::CommandExt as _;
+
+        let spawned = std::process::Command::new("rm")
+            .arg("-rf")
+            .arg("--")
+            .arg(&path)
+            .stdin(Stdio::null())
+            .stdout(Stdio::null())
+            .stderr(Stdio::null())
+            .process_group(0)
+            .spawn();
+
+        match spawned {
+            Ok(mut child) => {
+                std::thread::spawn(move || match child.wait() {
+                    Ok(status) if status.success() => {}
+                    Ok(status) => {
+                        warn!(path = ?path, %status, "Background directory removal failed");
+                    }
+                    Err(e) => {
+                        warn!(path = ?path, error = %e, "Failed to wait for background rm");
+                    }
+                });
+                return;
+            }
+            Err(e) => {
+                debug!(path = ?path, error = %e, "Failed to spawn rm; deleting on a thread");
+            }
+        }
+    }
+
+    std::thread::spawn(move || {
+        if let Err(e) = remove_dir_all_with_retries(&path) {
+            warn!(path = ?path, error = %e, "Failed to remove directory in background");
+        }
+    });
+}
+
 fn is_empty_dir(path: &Path) -> Result<bool> {
     let mut entries = fs::read_dir(path)
         .with_context(|| format!("Failed to read directory {}", path.display()))?;
@@ -850,6 +961,10 @@ impl<'a> Manager<'a> {
         if let Ok(worktree) = self.repo.find_worktree(&worktree_name) {
             let wt_path = worktree.path().to_path_buf();
 
+            // Move the checkout aside so the recursive delete happens in the background rather
+            // than inside prune. If it cannot be moved, prune deletes it in place as before.
+            let trash_path = move_dir_aside(&wt_path);
+
             // Retry prune up to 3 times with increasing delays
             // This handles race conditions where processes are still terminating
             let mut prune_succeeded = false;
@@ -860,7 +975,7 @@ impl<'a> Manager<'a> {
                 }
 
                 let mut opts = git2::WorktreePruneOptions::new();
-                opts.valid(true).working_tree(true);
+                opts.valid(true).working_tree(trash_path.is_none());
                 match worktree.prune(Some(&mut opts)) {
                     Ok(()) => {
                         prune_succeeded = true;
@@ -877,7 +992,9 @@ impl<'a> Manager<'a> {
 
             // Always try to remove the directory even if prune failed (may take time for processes
             // to release handles).
-            if let Err(e) = remove_dir_all_with_retries(&wt_path) {
+            if let Some(trash_path) = trash_path {
+                spawn_remove_dir_all(trash_path);
+            } else if let Err(e) = remove_dir_all_with_retries(&wt_path) {
                 warn!(name, path = ?wt_path, error = %e, "Failed to remove worktree directory");
                 return Err(e);
             }
@@ -921,6 +1038,10 @@ impl<'a> Manager<'a> {
         if let Ok(worktree) = self.repo.find_worktree(&worktree_name) {
             let wt_path = worktree.path().to_path_buf();
 
+            // Move the checkout aside so the recursive delete happens in the background rather
+            // than inside prune. If it cannot be moved, prune deletes it in place as before.
+            let trash_path = move_dir_aside(&wt_path);
+
             // Retry prune up to 3 times with increasing delays
             // This handles race conditions where processes are still terminating
             let mut prune_succeeded = false;
@@ -931,7 +1052,7 @@ impl<'a> Manager<'a> {
                 }
 
                 let mut opts = git2::WorktreePruneOptions::new();
-                opts.valid(true).working_tree(true);
+                opts.valid(true).working_tree(trash_path.is_none());
                 match worktree.prune(Some(&mut opts)) {
                     Ok(()) => {
                         prune_succeeded = true;
@@ -948,7 +1069,9 @@ impl<'a> Manager<'a> {
 
             // Always try to remove the directory even if prune failed (may take time for processes
             // to release handles).
-            if let Err(e) = remove_dir_all_with_retries(&wt_path) {
+            if let Some(trash_path) = trash_path {
+                spawn_remove_dir_all(trash_path);
+            } else if let Err(e) = remove_dir_all_with_retries(&wt_path) {
                 warn!(name, path = ?wt_path, error = %e, "Failed to remove worktree directory");
                 return Err(e);
             }
@@ -12,11 +12,19 @@ use super::protocol::{MuxRequest, MuxResponse};
 use interprocess::local_socket::Stream;
 use interprocess::local_socket::traits::Stream as StreamTrait;
 
+use std::collections::{HashMap, HashSet};
 #[cfg(target_os = "linux")]
-use std::collections::HashMap;
-use std::collections::HashSet;
+use std::io::Read as _;
 #[cfg(target_os = "linux")]
-use std::path::Path;
+use std::path::{Path, PathBuf};
+
+/// How much of each process command line is inspected when looking for `tenex muxd`.
+///
+/// The daemon is launched as `<tenex> muxd`, so the interesting arguments sit at the front; a
+/// truncated tail can at worst produce a false candidate, which the `TENEX_MUX_SOCKET` check on
+/// the process environment filters out.
+#[cfg(target_os = "linux")]
+const CMDLINE_PREFIX_LEN: u64 = 4096;
 
 /// Attempt to find a running mux daemon socket that contains at least one of the requested
 /// session names.
@@ -41,9 +49,29 @@ pub fn discover_socket_for_sessions(
 
     candidates.extend(super::socket_display().ok());
 
+    // Usually the preferred or default daemon already holds every wanted session. Settle on it
+    // before enumerating running daemons, which means walking every process on the host.
+    let mut probed: HashMap<String, Option<usize>> = HashMap::new();
+    for candidate in &candidates {
+        if probed.contains_key(candidate) {
+            continue;
+        }
+
+        let matches = probe_session_matches(candidate, wanted_sessions);
+        if matches == Some(wanted_sessions.len()) {
+            return Some(candidate.clone());
+        }
+        probed.insert(candidate.clone(), matches);
+    }
+
     candidates.extend(running_mux_sockets());
 
-    discover_socket_for_session_candidates(wanted_sessions, candidates, probe_session_matches)
+    discover_socket_for_session_candidates(wanted_sessions, candidates, |socket, wanted| {
+        probed
+            .get(socket)
+            .copied()
+            .unwrap_or_else(|| probe_session_matches(socket, wanted))
+    })
 }
 
 fn discover_socket_for_session_candidates<S, F>(
@@ -174,14 +202,16 @@ pub(super) fn pid_is_alive(pid: u32) -> bool {
 fn pid_is_alive_in_proc_root(proc_root: &Path, pid: u32) -> bool {
     let proc_dir = proc_root.join(pid.to_string());
     let stat_path = proc_dir.join("stat");
-    let Ok(stat) = std::fs::read_to_string(stat_path) else {
+    // Read raw bytes: the command name embedded in `stat` is not guaranteed to be UTF-8, and
+    // only the single state byte after it matters.
+    let Ok(stat) = std::fs::read(stat_path) else {
         return std::fs::metadata(proc_dir).is_ok();
     };
 
-    let Some(idx) = stat.rfind(") ") else {
+    let Some(idx) = stat.windows(2).rposition(|window| window == b") ") else {
         return true;
     };
-    !matches!(stat.as_bytes().get(idx.saturating_add(2)), Some(b'Z'))
+    !matches!(stat.get(idx.saturating_add(2)), Some(b'Z'))
 }
 
 #[cfg(target_os = "linux")]
@@ -192,41 +222,82 @@ fn mux_daemon_pids_for_socket_in_proc_root(proc_root: &Path, socket: &str) -> Ve
     }
 
     let mut pids = Vec::new();
+    for_each_mux_daemon_in_proc_root(proc_root, |pid, socket| {
+        if socket == wanted_socket {
+            pids.push(pid);
+        }
+    });
+    pids
+}
+
+/// Call `visit` with the PID and trimmed `TENEX_MUX_SOCKET` of every `tenex muxd` process.
+///
+/// The path and command line buffers are set up once and reused for every `/proc` entry.
+#[cfg(target_os = "linux")]
+fn for_each_mux_daemon_in_proc_root(proc_root: &Path, mut visit: impl FnMut(u32, &str)) {
     let Ok(entries) = std::fs::read_dir(proc_root) else {
-        return Vec::new();
+        return;
     };
 
+    let mut cmdline = Vec::new();
+    let mut path = PathBuf::new();
+
     for entry in entries.flatten() {
         let file_name = entry.file_name();
-        let Some(pid_str) = file_name.to_str() else {
+        let Some(pid_str) = pid_dir_name(&file_name) else {
             continue;
         };
         let Ok(pid) = pid_str.parse::<u32>() else {
             continue;
         };
 
-        let base = entry.path();
-        let Ok(cmdline) = std::fs::read(base.join("cmdline")) else {
+        let Some(environ) = read_mux_daemon_environ(proc_root, pid_str, &mut path, &mut cmdline)
+        else {
             continue;
         };
-        if !cmdline_contains_muxd(&cmdline) {
-            continue;
+
+        if let Some(value) = environ_value(&environ, b"TENEX_MUX_SOCKET") {
+            visit(pid, value.trim());
         }
+    }
+}
 
-        let Ok(environ) = std::fs::read(base.join("environ")) else {
-            continue;
-        };
+/// Check that `pid` is still a `tenex muxd` process serving `socket`.
+///
+/// Used after a pidfd has been opened for a PID found by an earlier `/proc` scan, in case the
+/// daemon exited and its PID was reused in between.
+#[cfg(target_os = "linux")]
+pub(super) fn pid_is_mux_daemon_for_socket(pid: u32, socket: &str) -> bool {
+    pid_is_mux_daemon_for_socket_in_proc_root(Path::new("/proc"), pid, socket)
+}
 
-        let parsed = parse_environ(&environ);
-        let Some(value) = parsed.get("TENEX_MUX_SOCKET") else {
-            continue;
-        };
-        if value.trim() == wanted_socket {
-            pids.push(pid);
-        }
+#[cfg(target_os = "linux")]
+fn pid_is_mux_daemon_for_socket_in_proc_root(proc_root: &Path, pid: u32, socket: &str) -> bool {
+    let mut path = PathBuf::new();
+    let mut cmdline = Vec::new();
+    read_mux_daemon_environ(proc_root, &pid.to_string(), &mut path, &mut cmdline)
+        .as_deref()
+        .and_then(|environ| environ_value(environ, b"TENEX_MUX_SOCKET"))
+        .is_some_and(|value| value.trim() == socket.trim())
+}
+
+/// Read the environment of `<proc_root>/<pid>` if that process is a `tenex muxd`.
+///
+/// `path` and `cmdline` are scratch buffers that callers reuse across `/proc` entries.
+#[cfg(target_os = "linux")]
+fn read_mux_daemon_environ(
+    proc_root: &Path,
+    pid: &str,
+    path: &mut PathBuf,
+    cmdline: &mut Vec<u8>,
+) -> Option<Vec<u8>> {
+    if !read_cmdline_prefix(proc_file(path, proc_root, pid, "cmdline"), cmdline)
+        || !cmdline_contains_muxd(cmdline)
+    {
+        return None;
     }
 
-    pids
+    std::fs::read(proc_file(path, proc_root, pid, "environ")).ok()
 }
 
 fn probe_session_matches<S: std::hash::BuildHasher>(
@@ -259,44 +330,11 @@ fn running_mux_sockets() -> Vec<String> {
 #[cfg(target_os = "linux")]
 fn running_mux_sockets_in_proc_root(proc_root: &Path) -> Vec<String> {
     let mut sockets = HashSet::new();
-
-    let Ok(entries) = std::fs::read_dir(proc_root) else {
-        return Vec::new();
-    };
-
-    for entry in entries.flatten() {
-        let file_name = entry.file_name();
-        let Some(pid) = file_name.to_str() else {
-            continue;
-        };
-        if pid.parse::<u32>().is_err() {
-            continue;
-        }
-
-        let base = entry.path();
-        let Ok(cmdline) = std::fs::read(base.join("cmdline")) else {
-            continue;
-        };
-        if !cmdline_contains_muxd(&cmdline) {
-            continue;
-        }
-
-        let Ok(environ) = std::fs::read(base.join("environ")) else {
-            continue;
-        };
-
-        let parsed = parse_environ(&environ);
-
-        if let Some(value) = parsed.get("TENEX_MUX_SOCKET") {
-            let trimmed = value.trim();
-            if trimmed.is_empty() {
-                continue;
-            }
-
-            let _ = sockets.insert(trimmed.to_string());
+    for_each_mux_daemon_in_proc_root(proc_root, |_, socket| {
+        if !socket.is_empty() && !sockets.contains(socket) {
+            let _ = sockets.insert(socket.to_string());
         }
-    }
-
+    });
     sockets.into_iter().collect()
 }
 
@@ -320,6 +358,44 @@ fn running_mux_sockets() -> Vec<String> {
     sockets
 }
 
+/// Return `name` if it can be a `/proc/<pid>` directory.
+///
+/// Checks the first byte before doing any UTF-8 validation, so the non-numeric `/proc` entries
+/// (`self`, `sys`, `meminfo`, ...) are rejected immediately.
+#[cfg(target_os = "linux")]
+fn pid_dir_name(name: &std::ffi::OsStr) -> Option<&str> {
+    if !name
+        .as_encoded_bytes()
+        .first()
+        .is_some_and(u8::is_ascii_digit)
+    {
+        return None;
+    }
+    name.to_str()
+}
+
+/// Build `<proc_root>/<pid>/<file>` in `buf`, reusing its allocation across `/proc` entries.
+#[cfg(target_os = "linux")]
+fn proc_file<'buf>(buf: &'buf mut PathBuf, proc_root: &Path, pid: &str, file: &str) -> &'buf Path {
+    buf.as_mut_os_string().clear();
+    buf.push(proc_root);
+    buf.push(pid);
+    buf.push(file);
+    buf
+}
+
+/// Read at most [`CMDLINE_PREFIX_LEN`] bytes of a `/proc/<pid>/cmdline` file into `buf`.
+///
+/// `buf` is reused across processes so scanning `/proc` does not allocate per entry. Returns
+/// `false` when the file cannot be read (typically because the process already exited).
+#[cfg(target_os = "linux")]
+fn read_cmdline_prefix(path: &Path, buf: &mut Vec<u8>) -> bool {
+    buf.clear();
+    std::fs::File::open(path)
+        .and_then(|file| file.take(CMDLINE_PREFIX_LEN).read_to_end(buf))
+        .is_ok()
+}
+
 #[cfg(target_os = "linux")]
 fn cmdline_contains_muxd(cmdline: &[u8]) -> bool {
     cmdline
@@ -328,23 +404,14 @@ fn cmdline_contains_muxd(cmdline: &[u8]) -> bool {
         .any(|arg| arg == b"muxd")
 }
 
+/// Look up `key` in a NUL-separated `/proc/<pid>/environ` blob.
+///
+/// Matches on raw bytes so only the wanted entry is UTF-8 validated. Later entries win, like
+/// they would when the environment is collected into a map.
 #[cfg(target_os = "linux")]
-fn parse_environ(environ: &[u8]) -> HashMap<String, String> {
-    let mut vars = HashMap::new();
-
-    for entry in environ.split(|b| *b == 0).filter(|entry| !entry.is_empty()) {
-        let mut parts = entry.splitn(2, |b| *b == b'=');
-        let key = parts.next().unwrap_or_default();
-        let Some(value) = parts.next() else {
-            continue;
-        };
-
-        let (Ok(key), Ok(value)) = (std::str::from_utf8(key), std::str::from_utf8(value)) else {
-            continue;
-        };
-
-        vars.insert(key.to_string(), value.to_string());
-    }
-
-    vars
+fn environ_value<'a>(environ: &'a [u8], key: &[u8]) -> Option<&'a str> {
+    environ.rsplit(|b| *b == 0).find_map(|entry| {
+        let value = entry.strip_prefix(key)?.strip_prefix(b"=")?;
+        std::str::from_utf8(value).ok()
+    })
 }
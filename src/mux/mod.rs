@@ -11,6 +11,7 @@ mod output;
 #[cfg(not(target_os = "linux"))]
 mod pidfile;
 mod protocol;
+mod reap;
 pub(crate) mod render;
 mod server;
 mod session;
@@ -20,11 +21,13 @@ pub use endpoint::{SocketEndpoint, set_socket_override, socket_endpoint};
 pub use output::{OutputCursor, OutputRead, OutputStream};
 pub use session::{Manager as SessionManager, Session, Window};
 
-use anyhow::{Context, Result, bail};
+#[cfg(target_os = "linux")]
+pub(crate) use reap::{Signal, signal_pid};
+
+use anyhow::{Result, bail};
 use interprocess::local_socket::Stream;
 use interprocess::local_socket::traits::Stream as StreamTrait;
-use std::process::Command;
-use std::time::{Duration, Instant};
+use std::time::Duration;
 
 fn try_ping(stream: &mut Stream) -> Option<protocol::MuxResponse> {
     ipc::write_json(stream, &protocol::MuxRequest::Ping).ok()?;
@@ -74,44 +77,6 @@ pub fn running_daemon_version() -> Result<Option<String>> {
 }
 
 pub(crate) fn terminate_mux_daemon_for_socket(socket: &str) -> Result<()> {
-    fn send_signal(pid: u32, signal: &str) -> Result<()> {
-        let status = {
-            #[cfg(windows)]
-            {
-                let mut command = Command::new("taskkill");
-                if signal == "-KILL" {
-                    command.arg("/F");
-                }
-
-                command
-                    .arg("/PID")
-                    .arg(pid.to_string())
-                    .stdin(std::process::Stdio::null())
-                    .stdout(std::process::Stdio::null())
-                    .stderr(std::process::Stdio::null())
-                    .status()
-                    .with_context(|| format!("Failed to invoke taskkill for pid {pid}"))?
-            }
-
-            #[cfg(not(windows))]
-            {
-                Command::new("kill")
-                    .arg(signal)
-                    .arg(pid.to_string())
-                    .stdin(std::process::Stdio::null())
-                    .stdout(std::process::Stdio::null())
-                    .stderr(std::process::Stdio::null())
-                    .status()
-                    .with_context(|| format!("Failed to invoke kill {signal} {pid}"))?
-            }
-        };
-
-        if status.success() || !discovery::pid_is_alive(pid) {
-            return Ok(());
-        }
-        bail!("kill {signal} {pid} failed");
-    }
-
     let socket = socket.trim();
     if socket.is_empty() {
         bail!("Mux socket cannot be empty");
@@ -122,46 +87,24 @@ pub(crate) fn terminate_mux_daemon_for_socket(socket: &str) -> Result<()> {
         return Ok(());
     }
 
-    let mut signal_failures = Vec::new();
-    for pid in &pids {
-        if let Err(err) = send_signal(*pid, "-TERM") {
-            signal_failures.push(err);
-        }
-    }
+    let mut targets = reap::Targets::open(pids, socket);
 
-    let deadline = Instant::now() + Duration::from_millis(500);
-    let mut remaining: Vec<u32> = pids;
-    while Instant::now() < deadline {
-        remaining.retain(|pid| discovery::pid_is_alive(*pid));
-        if remaining.is_empty() {
-            break;
-        }
-        std::thread::sleep(Duration::from_millis(10));
-    }
+    let mut signal_failures = targets.signal(reap::Signal::Term);
 
-    if remaining.is_empty() {
+    targets.wait_for_exit(Duration::from_millis(500));
+    if targets.is_empty() {
         return Ok(());
     }
 
-    for pid in &remaining {
-        if let Err(err) = send_signal(*pid, "-KILL") {
-            signal_failures.push(err);
-        }
-    }
-
-    let deadline = Instant::now() + Duration::from_millis(250);
-    while Instant::now() < deadline {
-        remaining.retain(|pid| discovery::pid_is_alive(*pid));
-        if remaining.is_empty() {
-            break;
-        }
-        std::thread::sleep(Duration::from_millis(10));
-    }
+    signal_failures.extend(targets.signal(reap::Signal::Kill));
 
-    if remaining.is_empty() {
+    targets.wait_for_exit(Duration::from_millis(250));
+    if targets.is_empty() {
         return Ok(());
     }
 
+    let remaining = targets.pids();
+
     if signal_failures.is_empty() {
         bail!("Failed to terminate mux daemon (pids: {remaining:?})");
     }
@@ -0,0 +1,321 @@
+//! Signalling mux daemon processes and waiting for them to exit.
+//!
+//! On Linux each daemon is pinned with a pidfd and then re-checked against `/proc`, so a PID
+//! that was recycled between discovery and `pidfd_open` is dropped rather than signalled, and
+//! termination can be awaited with a single `poll(2)` instead of re-reading `/proc` on a timer.
+//! Kernels without `pidfd_open` (older than 5.3) fall back to `kill(2)` and periodic liveness
+//! checks, which carry the usual PID reuse race; other platforms spawn `kill`/`taskkill`.
+
+use super::discovery;
+#[cfg(not(target_os = "linux"))]
+use anyhow::Context;
+use anyhow::{Result, bail};
+#[cfg(target_os = "linux")]
+use rustix::fd::OwnedFd;
+use std::time::{Duration, Instant};
+
+const LIVENESS_POLL_INTERVAL: Duration = Duration::from_millis(10);
+
+#[cfg(target_os = "linux")]
+const MAX_PIDFDS: u64 = 512;
+
+/// Signals used to shut down a mux daemon.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub enum Signal {
+    Term,
+    Kill,
+}
+
+impl Signal {
+    const fn kill_arg(self) -> &'static str {
+        match self {
+            Self::Term => "-TERM",
+            Self::Kill => "-KILL",
+        }
+    }
+
+    #[cfg(target_os = "linux")]
+    const fn to_rustix(self) -> rustix::process::Signal {
+        match self {
+            Self::Term => rustix::process::Signal::TERM,
+            Self::Kill => rustix::process::Signal::KILL,
+        }
+    }
+}
+
+/// A set of mux daemon processes that are being shut down.
+#[derive(Debug)]
+pub(super) struct Targets {
+    targets: Vec<Target>,
+}
+
+#[derive(Debug)]
+struct Target {
+    pid: u32,
+    #[cfg(target_os = "linux")]
+    pidfd: Option<OwnedFd>,
+}
+
+impl Targets {
+    /// Start tracking `pids`, the mux daemons discovered for `socket`.
+    ///
+    /// On Linux this opens a pidfd per process up front, so later signals and waits refer to
+    /// the exact process that was discovered even if its PID is recycled. Processes that are no
+    /// longer the daemon for `socket` once their pidfd is open are dropped.
+    pub(super) fn open(pids: Vec<u32>, socket: &str) -> Self {
+        #[cfg(target_os = "linux")]
+        let targets = {
+            let mut pidfd_budget = pidfd_budget();
+            pids.into_iter()
+                .filter_map(|pid| Target::open(pid, socket, &mut pidfd_budget))
+                .collect()
+        };
+        #[cfg(not(target_os = "linux"))]
+        let targets = {
+            let _ = socket;
+            pids.into_iter().map(|pid| Target { pid }).collect()
+        };
+
+        Self { targets }
+    }
+
+    /// PIDs of the processes that have not been observed to exit yet.
+    pub(super) fn pids(&self) -> Vec<u32> {
+        self.targets.iter().map(|target| target.pid).collect()
+    }
+
+    pub(super) const fn is_empty(&self) -> bool {
+        self.targets.is_empty()
+    }
+
+    /// Send `signal` to every tracked process, returning the delivery failures.
+    pub(super) fn signal(&self, signal: Signal) -> Vec<anyhow::Error> {
+        self.targets
+            .iter()
+            .filter_map(|target| target.signal(signal).err())
+            .collect()
+    }
+
+    /// Block until every tracked process has exited or `timeout` elapses.
+    ///
+    /// Processes that exit are dropped from the set. Targets with a pidfd are awaited with
+    /// `poll(2)`; any without one are re-checked every [`LIVENESS_POLL_INTERVAL`].
+    pub(super) fn wait_for_exit(&mut self, timeout: Duration) {
+        let deadline = Instant::now() + timeout;
+
+        loop {
+            self.targets
+                .retain(|target| target.has_pidfd() || discovery::pid_is_alive(target.pid));
+            if self.targets.is_empty() {
+                return;
+            }
+
+            let remaining = deadline.saturating_duration_since(Instant::now());
+            if remaining.is_zero() {
+                return;
+            }
+
+            let slice = if self.targets.iter().all(Target::has_pidfd) {
+                remaining
+            } else {
+                remaining.min(LIVENESS_POLL_INTERVAL)
+            };
+            #[cfg(target_os = "linux")]
+            self.wait_for_pidfds(slice);
+            #[cfg(not(target_os = "linux"))]
+            std::thread::sleep(slice);
+        }
+    }
+
+    /// Wait up to `timeout` for pidfd-backed targets to exit, dropping those that did.
+    ///
+    /// Sleeps instead when no target has a pidfd. If `poll` itself fails, every target is
+    /// downgraded to liveness checks.
+    #[cfg(target_os = "linux")]
+    fn wait_for_pidfds(&mut self, timeout: Duration) {
+        use rustix::event::{PollFd, PollFlags, Timespec};
+        use rustix::io::Errno;
+
+        let Ok(timespec) = Timespec::try_from(timeout) else {
+            std::thread::sleep(timeout);
+            return;
+        };
+
+        let mut fds: Vec<PollFd<'_>> = self
+            .targets
+            .iter()
+            .filter_map(|target| target.pidfd.as_ref())
+            .map(|pidfd| PollFd::new(pidfd, PollFlags::IN))
+            .collect();
+        if fds.is_empty() {
+            std::thread::sleep(timeout);
+            return;
+        }
+
+        let polled = rustix::event::poll(&mut fds, Some(&timespec));
+        let exited: Vec<u32> = self
+            .targets
+            .iter()
+            .filter(|target| target.has_pidfd())
+            .zip(&fds)
+            .filter(|(_, fd)| !fd.revents().is_empty())
+            .map(|(target, _)| target.pid)
+            .collect();
+
+        match polled {
+            Ok(_) | Err(Errno::INTR) => {}
+            Err(_) => {
+                for target in &mut self.targets {
+                    target.pidfd = None;
+                }
+                return;
+            }
+        }
+
+        self.targets.retain(|target| !exited.contains(&target.pid));
+    }
+}
+
+/// How many pidfds may be held at once.
+///
+/// Bounded by [`MAX_PIDFDS`] and half the soft `RLIMIT_NOFILE`, so a large number of leaked
+/// daemons cannot exhaust the descriptor table; targets beyond the budget use liveness checks.
+#[cfg(target_os = "linux")]
+fn pidfd_budget() -> usize {
+    use rustix::process::{Resource, getrlimit};
+
+    let soft_limit = getrlimit(Resource::Nofile).current.unwrap_or(u64::MAX);
+    usize::try_from(MAX_PIDFDS.min(soft_limit / 2)).unwrap_or_default()
+}
+
+impl Target {
+    #[cfg(target_os = "linux")]
+    fn open(pid: u32, socket: &str, pidfd_budget: &mut usize) -> Option<Self> {
+        use rustix::io::Errno;
+        use rustix::process::{Pid, PidfdFlags};
+
+        if *pidfd_budget == 0 {
+            return Some(Self { pid, pidfd: None });
+        }
+        let Some(raw_pid) = i32::try_from(pid).ok().and_then(Pid::from_raw) else {
+            return Some(Self { pid, pidfd: None });
+        };
+
+        match rustix::process::pidfd_open(raw_pid, PidfdFlags::empty()) {
+            Ok(pidfd) => {
+                // The PID came from an earlier /proc scan. If it has been reused since, the
+                // pidfd now pins an unrelated process; check before ever signalling it.
+                if !discovery::pid_is_mux_daemon_for_socket(pid, socket) {
+                    return None;
+                }
+                *pidfd_budget -= 1;
+                Some(Self {
+                    pid,
+                    pidfd: Some(pidfd),
+                })
+            }
+            // Already gone between discovery and now.
+            Err(Errno::SRCH) => None,
+            Err(_) => Some(Self { pid, pidfd: None }),
+        }
+    }
+
+    #[cfg(target_os = "linux")]
+    const fn has_pidfd(&self) -> bool {
+        self.pidfd.is_some()
+    }
+
+    #[cfg(not(target_os = "linux"))]
+    const fn has_pidfd(&self) -> bool {
+        let _ = self;
+        false
+    }
+
+    fn signal(&self, signal: Signal) -> Result<()> {
+        #[cfg(target_os = "linux")]
+        if let Some(pidfd) = &self.pidfd {
+            return match rustix::process::pidfd_send_signal(pidfd, signal.to_rustix()) {
+                // ESRCH means the process has already exited.
+                Ok(()) | Err(rustix::io::Errno::SRCH) => Ok(()),
+                Err(err) => bail!(
+                    "pidfd_send_signal {} {} failed: {err}",
+                    signal.kill_arg(),
+                    self.pid
+                ),
+            };
+        }
+
+        #[cfg(target_os = "linux")]
+        {
+            signal_pid(self.pid, signal)
+        }
+
+        #[cfg(not(target_os = "linux"))]
+        {
+            send_signal_command(self.pid, signal)
+        }
+    }
+}
+
+/// Send `signal` to `pid` with `kill(2)`.
+///
+/// A process that has already exited counts as success.
+///
+/// # Errors
+///
+/// Returns an error if `pid` is not a valid PID or `kill(2)` fails for any other reason, such
+/// as missing permission.
+#[cfg(target_os = "linux")]
+pub fn signal_pid(pid: u32, signal: Signal) -> Result<()> {
+    let Some(raw_pid) = i32::try_from(pid)
+        .ok()
+        .and_then(rustix::process::Pid::from_raw)
+    else {
+        bail!("Invalid pid {pid}");
+    };
+
+    match rustix::process::kill_process(raw_pid, signal.to_rustix()) {
+        Ok(()) | Err(rustix::io::Errno::SRCH) => Ok(()),
+        Err(err) => bail!("kill {} {pid} failed: {err}", signal.kill_arg()),
+    }
+}
+
+#[cfg(not(target_os = "linux"))]
+fn send_signal_command(pid: u32, signal: Signal) -> Result<()> {
+    let status = {
+        #[cfg(windows)]
+        {
+            let mut command = std::process::Command::new("taskkill");
+            if signal == Signal::Kill {
+                command.arg("/F");
+            }
+
+            command
+                .arg("/PID")
+                .arg(pid.to_string())
+                .stdin(std::process::Stdio::null())
+                .stdout(std::process::Stdio::null())
+                .stderr(std::process::Stdio::null())
+                .status()
+                .with_context(|| format!("Failed to invoke taskkill for pid {pid}"))?
+        }
+
+        #[cfg(not(windows))]
+        {
+            let signal = signal.kill_arg();
+            std::process::Command::new("kill")
+                .arg(signal)
+                .arg(pid.to_string())
+                .stdin(std::process::Stdio::null())
+                .stdout(std::process::Stdio::null())
+                .stderr(std::process::Stdio::null())
+                .status()
+                .with_context(|| format!("Failed to invoke kill {signal} {pid}"))?
+        }
+    };
+
+    if status.success() || !discovery::pid_is_alive(pid) {
+        return Ok(());
+    }
+    bail!("kill {} {pid} failed", signal.kill_arg());
+}